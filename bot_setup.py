@@ -28,6 +28,15 @@ from handlers import (
     query_manual,
     done,
 )
+from faq_index import load_faq_index
+from message_sender import MessageSender
+
+
+async def stop_message_sender(application: Application) -> None:
+    """봇 종료 시 발신 메시지 큐 정리"""
+    sender: MessageSender | None = application.bot_data.get("message_sender")
+    if sender:
+        await sender.stop()
 
 
 def create_bot_application() -> Application:
@@ -35,7 +44,15 @@ def create_bot_application() -> Application:
     if not BOT_TOKEN:
         raise ValueError("BOT_TOKEN이 설정되지 않았습니다.")
 
-    application = Application.builder().token(BOT_TOKEN).build()
+    application = (
+        Application.builder().token(BOT_TOKEN).post_stop(stop_message_sender).build()
+    )
+
+    # 미리 계산된 FAQ 답변 인덱스 로드 (없으면 RAG로만 답변)
+    application.bot_data["faq_index"] = load_faq_index()
+
+    # 전송 속도 제한을 적용하는 발신 메시지 큐 (핸들러는 이 큐로 답장)
+    application.bot_data["message_sender"] = MessageSender()
 
     # 기본 명령어 핸들러
     application.add_handler(CommandHandler("start", start_command))
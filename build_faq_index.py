@@ -0,0 +1,76 @@
+"""
+FAQ 답변 인덱스 생성 스크립트 (오프라인 작업)
+
+모델별 자주 묻는 질문 목록(JSON)을 읽어 매뉴얼 RAG 파이프라인으로 답변을 미리
+생성하고, 질문 임베딩과 함께 FAQ 인덱스 파일로 저장합니다.
+
+질문 파일 형식:
+    {
+        "X-T30": [
+            "배터리는 어떻게 충전하나요?",
+            {"question": "펌웨어 업데이트 방법", "answer": "직접 작성한 답변"}
+        ]
+    }
+
+문자열 항목은 답변을 생성하고, answer가 있는 항목은 작성된 답변을 그대로 사용합니다.
+"""
+
+import argparse
+import json
+
+from bot_config import logger, SUPPORTED_MODELS
+from faq_index import FAQ_INDEX_PATH, FaqEntry, FaqIndex
+from handlers import generate_answer, get_embeddings_model, load_pinecone_db
+
+
+def build_faq_index(questions_path: str, output_path: str) -> FaqIndex:
+    """질문 파일을 읽어 FAQ 인덱스 생성 및 저장"""
+    with open(questions_path, encoding="utf-8") as f:
+        questions_by_model: dict[str, list] = json.load(f)
+
+    pinecone_db = load_pinecone_db()
+    entries: list[FaqEntry] = []
+
+    for model, items in questions_by_model.items():
+        if model not in SUPPORTED_MODELS:
+            logger.warning(f"지원하지 않는 모델은 건너뜁니다: {model}")
+            continue
+
+        for item in items:
+            if isinstance(item, str):
+                question, answer = item, None
+            else:
+                question, answer = item["question"], item.get("answer")
+
+            if not answer:
+                answer = generate_answer(pinecone_db, model, question)
+                logger.info(f"FAQ 답변 생성 - 모델: {model}, 질문: {question}")
+
+            entries.append(FaqEntry(model=model, question=question, answer=answer))
+
+    embeddings = get_embeddings_model().embed_documents(
+        [entry.question for entry in entries]
+    )
+    faq_index = FaqIndex(entries, embeddings)
+    faq_index.save(output_path)
+
+    logger.info(f"FAQ 인덱스 저장 완료: {output_path}, 항목 수: {len(faq_index)}")
+    return faq_index
+
+
+def main() -> None:
+    """메인 함수 - FAQ 인덱스 생성"""
+    parser = argparse.ArgumentParser(description="FAQ 답변 인덱스 생성")
+    parser.add_argument("questions", help="모델별 FAQ 질문 JSON 파일 경로")
+    parser.add_argument(
+        "--output",
+        default=FAQ_INDEX_PATH,
+        help="FAQ 인덱스 저장 경로 (확장자 제외)",
+    )
+    args = parser.parse_args()
+
+    build_faq_index(args.questions, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+매뉴얼 청크 중복 제거
+
+매뉴얼에 반복되는 안전 경고, 각주, 메뉴 표 등 거의 동일한 청크를
+MinHash(문자 shingle) + LSH로 찾아 하나의 대표 청크만 남깁니다.
+대표 청크의 메타데이터에는 중복된 모든 페이지 번호가 기록됩니다.
+"""
+
+import os
+import re
+import zlib
+from dataclasses import dataclass
+
+import numpy as np
+from langchain_core.documents import Document
+
+# 중복으로 판단할 최소 Jaccard 유사도
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.85"))
+# shingle 길이 (문자 단위 - 한글 매뉴얼에 맞춰 단어 대신 문자 사용)
+SHINGLE_SIZE = 5
+# MinHash 해시 개수 = 밴드 수 x 밴드당 행 수
+NUM_BANDS = 16
+ROWS_PER_BAND = 8
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+@dataclass
+class DedupStats:
+    """중복 제거 결과 통계"""
+
+    total_chunks: int
+    unique_chunks: int
+
+    @property
+    def removed_chunks(self) -> int:
+        return self.total_chunks - self.unique_chunks
+
+    @property
+    def reduction_ratio(self) -> float:
+        if self.total_chunks == 0:
+            return 0.0
+        return self.removed_chunks / self.total_chunks
+
+
+def _shingles(text: str) -> set[int]:
+    """공백/대소문자를 정규화한 문자 shingle 해시 집합"""
+    normalized = re.sub(r"\s+", " ", text).strip().lower()
+    if len(normalized) <= SHINGLE_SIZE:
+        return {zlib.crc32(normalized.encode("utf-8"))}
+    return {
+        zlib.crc32(normalized[i : i + SHINGLE_SIZE].encode("utf-8"))
+        for i in range(len(normalized) - SHINGLE_SIZE + 1)
+    }
+
+
+def _minhash_signatures(shingle_sets: list[set[int]]) -> np.ndarray:
+    """shingle 집합별 MinHash 서명 계산 (shape: 청크 수 x 해시 개수)"""
+    num_hashes = NUM_BANDS * ROWS_PER_BAND
+    rng = np.random.default_rng(1)
+    a = rng.integers(1, _MERSENNE_PRIME, size=num_hashes, dtype=np.uint64)
+    b = rng.integers(0, _MERSENNE_PRIME, size=num_hashes, dtype=np.uint64)
+
+    signatures = np.empty((len(shingle_sets), num_hashes), dtype=np.uint64)
+    for i, shingles in enumerate(shingle_sets):
+        values = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+        # (a * x + b) mod p 를 32비트로 잘라 사용 (uint64 오버플로는 의도된 동작)
+        hashed = (np.outer(values, a) + b) % _MERSENNE_PRIME & _MAX_HASH
+        signatures[i] = hashed.min(axis=0)
+    return signatures
+
+
+def _page_no(doc: Document) -> int | None:
+    """PyPDFLoader 메타데이터의 0부터 시작하는 page를 1부터 시작하는 번호로 변환"""
+    page = doc.metadata.get("page")
+    return page + 1 if isinstance(page, int) else None
+
+
+def deduplicate_documents(
+    documents: list[Document], threshold: float = DEDUP_THRESHOLD
+) -> tuple[list[Document], DedupStats]:
+    """거의 동일한 청크를 제거하고 대표 청크에 중복 페이지 목록을 기록"""
+    if not documents:
+        return [], DedupStats(total_chunks=0, unique_chunks=0)
+
+    shingle_sets = [_shingles(doc.page_content) for doc in documents]
+    signatures = _minhash_signatures(shingle_sets)
+
+    # LSH: 밴드가 하나라도 같으면 후보, 실제 Jaccard 유사도로 확인
+    canonical_of = list(range(len(documents)))
+    buckets: dict[tuple[int, bytes], list[int]] = {}
+
+    for i in range(len(documents)):
+        candidates: set[int] = set()
+        for band in range(NUM_BANDS):
+            key = (
+                band,
+                signatures[i, band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND].tobytes(),
+            )
+            bucket = buckets.setdefault(key, [])
+            candidates.update(bucket)
+            bucket.append(i)
+
+        for j in sorted(candidates):
+            if canonical_of[j] != j:
+                continue
+            intersection = len(shingle_sets[i] & shingle_sets[j])
+            union = len(shingle_sets[i] | shingle_sets[j])
+            if union and intersection / union >= threshold:
+                canonical_of[i] = j
+                break
+
+    pages_of: dict[int, list[int]] = {}
+    for i, canonical in enumerate(canonical_of):
+        page_no = _page_no(documents[i])
+        pages = pages_of.setdefault(canonical, [])
+        if page_no is not None and page_no not in pages:
+            pages.append(page_no)
+
+    unique_docs = []
+    for i, doc in enumerate(documents):
+        if canonical_of[i] != i:
+            continue
+        # Pinecone 메타데이터 리스트는 문자열만 허용
+        doc.metadata["pages"] = [str(page) for page in sorted(pages_of[i])]
+        unique_docs.append(doc)
+
+    return unique_docs, DedupStats(
+        total_chunks=len(documents), unique_chunks=len(unique_docs)
+    )
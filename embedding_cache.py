@@ -0,0 +1,427 @@
+"""
+디스크 기반 임베딩 캐시
+
+hash(모델 이름 + 청크 텍스트)를 키로 임베딩 벡터를 메모리 맵 파일에 저장합니다.
+각 행에는 키 해시와 벡터가 함께 들어 있어 벡터 파일 자체가 키 → 행 번호 정보를
+가지며 (행별 마지막 사용 시각은 작은 별도 파일 ticks.bin), 새로 쓰거나 비운 행만 추가 전용 로그(index.log)에
+기록해 다른 프로세스가 바뀐 부분만 반영합니다.
+매뉴얼 재업로드, 인덱스 재구축 시 이미 계산한 임베딩을 다시 계산하지 않습니다.
+
+서버, 일괄 적재, FAQ 생성 프로세스가 같은 캐시 디렉터리를 함께 쓰므로
+파일 잠금(flock) 안에서 로그를 반영한 뒤 행을 할당하고,
+읽을 때 행의 키 해시가 다르면 캐시 미스로 처리합니다.
+"""
+
+import atexit
+import json
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from bot_config import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows - 프로세스 간 잠금 없이 행별 키 확인만 사용
+    fcntl = None
+
+# 캐시 저장 디렉터리
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", ".embedding_cache")
+# 캐시에 보관할 최대 벡터 수 (초과 시 가장 오래 사용하지 않은 벡터부터 제거)
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+
+_INITIAL_ROWS = 1024
+_KEY_BYTES = 32
+_EMPTY_KEY = bytes(_KEY_BYTES)
+_MAX_TICK = np.iinfo(np.uint64).max
+
+# 로그 레코드 (행 번호 + 새 키 해시, 키가 0이면 비운 행)
+_LOG_DTYPE = np.dtype([("row", np.uint32), ("key", np.uint8, (_KEY_BYTES,))])
+
+
+def _row_dtype(dim: int) -> np.dtype:
+    """벡터 파일 한 행의 구조 (키 해시 + float32 벡터)"""
+    return np.dtype([("key", np.uint8, (_KEY_BYTES,)), ("vec", np.float32, (dim,))])
+
+
+class EmbeddingCache:
+    """메모리 맵 파일 + 추가 전용 로그로 구성된 프로세스 간 공유 임베딩 캐시"""
+
+    def __init__(
+        self,
+        cache_dir: str = EMBEDDING_CACHE_DIR,
+        max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._vectors_path = os.path.join(cache_dir, "vectors.bin")
+        self._ticks_path = os.path.join(cache_dir, "ticks.bin")
+        self._meta_path = os.path.join(cache_dir, "meta.json")
+        self._log_path = os.path.join(cache_dir, "index.log")
+        self._lock_path = os.path.join(cache_dir, ".lock")
+        self._lock = threading.Lock()
+
+        self.dim: int | None = None
+        self._rows = 0
+        # 로그를 비울 때마다 증가 (다른 프로세스는 벡터 파일에서 다시 읽음)
+        self._generation = 0
+        self._meta_stat: tuple[int, int, int] | None = None
+        self._log_offset = 0
+        self._vectors: np.memmap | None = None
+        # 행별 마지막 사용 시각 (0이면 빈 행, LRU 제거 대상 선택에 사용)
+        self._ticks: np.memmap | None = None
+        # 키 → 행 번호, 행 번호 → 키, 비어 있는 행
+        self._slots: dict[str, int] = {}
+        self._row_keys: dict[int, str] = {}
+        self._free_rows: set[int] = set()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        with self._lock, self._file_lock(exclusive=True):
+            self._refresh()
+            # 최대 개수가 줄어든 경우 오래 사용하지 않은 벡터부터 제거
+            excess = len(self._slots) - self.max_entries
+            if excess > 0:
+                rows = self._evict_rows(excess)
+                self._vectors["key"][rows] = 0
+                self._ticks[rows] = 0
+                self._append_log([(row, None) for row in rows])
+
+        logger.info(f"임베딩 캐시 로드 완료: {self.cache_dir}, 벡터 수: {len(self)}")
+        atexit.register(self.flush)
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> str:
+        """모델 이름과 텍스트로 캐시 키 생성"""
+        digest = hashlib.sha256()
+        digest.update(model_name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool) -> Iterator[None]:
+        """캐시 디렉터리 잠금 (쓰기는 배타적, 읽기는 공유)"""
+        if fcntl is None:
+            yield
+            return
+
+        with open(self._lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _reset(self) -> None:
+        self.dim = None
+        self._rows = 0
+        self._generation = 0
+        self._meta_stat = None
+        self._log_offset = 0
+        self._vectors = None
+        self._ticks = None
+        self._slots = {}
+        self._row_keys = {}
+        self._free_rows = set()
+
+    def _refresh(self) -> None:
+        """다른 프로세스의 변경 반영 - 로그에 추가된 레코드만 읽음 (파일 잠금 안에서 호출)"""
+        try:
+            stat = os.stat(self._meta_path)
+        except FileNotFoundError:
+            self._reset()
+            return
+
+        try:
+            rebuild = False
+            meta_stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if meta_stat != self._meta_stat:
+                with open(self._meta_path, encoding="utf-8") as f:
+                    meta = json.load(f)
+
+                dim, rows = meta["dim"], meta["rows"]
+                if self._vectors is None or dim != self.dim:
+                    rebuild = True
+                elif rows != self._rows:
+                    # 다른 프로세스가 파일을 늘림 - 새 행은 비어 있는 상태로 시작
+                    self._free_rows.update(range(self._rows, rows))
+                if rows != self._rows or self._vectors is None or dim != self.dim:
+                    self._map_files(dim, rows)
+                if meta["generation"] != self._generation:
+                    rebuild = True
+
+                self.dim, self._rows = dim, rows
+                self._generation = meta["generation"]
+                self._meta_stat = meta_stat
+
+            log_size = (
+                os.path.getsize(self._log_path) if os.path.exists(self._log_path) else 0
+            )
+            if log_size < self._log_offset:
+                rebuild = True
+
+            if rebuild:
+                self._rebuild()
+                self._log_offset = log_size
+            elif log_size > self._log_offset:
+                with open(self._log_path, "rb") as f:
+                    f.seek(self._log_offset)
+                    count = (log_size - self._log_offset) // _LOG_DTYPE.itemsize
+                    records = np.frombuffer(
+                        f.read(count * _LOG_DTYPE.itemsize), dtype=_LOG_DTYPE
+                    )
+                for row, key in zip(records["row"].tolist(), records["key"]):
+                    key_bytes = key.tobytes()
+                    self._apply(row, None if key_bytes == _EMPTY_KEY else key_bytes.hex())
+                self._log_offset += count * _LOG_DTYPE.itemsize
+        except Exception as e:
+            logger.error(f"임베딩 캐시 로드 실패, 캐시를 초기화합니다: {e}")
+            self._reset()
+
+    def _rebuild(self) -> None:
+        """벡터 파일의 키 열에서 키 → 행 번호 정보를 다시 생성"""
+        assert self._vectors is not None
+        keys = np.asarray(self._vectors["key"])
+        used_rows = np.flatnonzero(keys.any(axis=1))
+        raw_keys = np.ascontiguousarray(keys[used_rows]).tobytes()
+
+        self._slots = {
+            raw_keys[i * _KEY_BYTES : (i + 1) * _KEY_BYTES].hex(): row
+            for i, row in enumerate(used_rows.tolist())
+        }
+        self._row_keys = {row: key for key, row in self._slots.items()}
+        self._free_rows = set(range(self._rows)).difference(used_rows.tolist())
+
+    def _apply(self, row: int, key: str | None) -> None:
+        """행 하나의 키 변경을 메모리 정보에 반영 (key가 None이면 비운 행)"""
+        old_key = self._row_keys.pop(row, None)
+        if old_key is not None and self._slots.get(old_key) == row:
+            del self._slots[old_key]
+
+        if key is None:
+            self._free_rows.add(row)
+            return
+
+        self._slots[key] = row
+        self._row_keys[row] = key
+        self._free_rows.discard(row)
+
+    def _append_log(self, changes: list[tuple[int, str | None]]) -> None:
+        """행 변경을 메모리에 반영하고 로그 끝에 추가 (배타적 잠금 안에서 호출)"""
+        records = np.zeros(len(changes), dtype=_LOG_DTYPE)
+        for i, (row, key) in enumerate(changes):
+            records[i]["row"] = row
+            if key is not None:
+                records[i]["key"] = np.frombuffer(bytes.fromhex(key), dtype=np.uint8)
+            self._apply(row, key)
+
+        with open(self._log_path, "ab") as f:
+            f.write(records.tobytes())
+        self._log_offset = os.path.getsize(self._log_path)
+
+        # 로그가 커지면 비우고 세대 번호 증가 (다른 프로세스는 벡터 파일에서 다시 읽음)
+        if self._log_offset > 2 * max(self._rows, _INITIAL_ROWS) * _LOG_DTYPE.itemsize:
+            self._flush_files()
+            open(self._log_path, "wb").close()
+            self._log_offset = 0
+            self._generation += 1
+            self._write_meta()
+
+    def _map_files(self, dim: int, rows: int) -> None:
+        """벡터 파일과 사용 시각 파일을 메모리 맵으로 연결"""
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=_row_dtype(dim), mode="r+", shape=(rows,)
+        )
+        self._ticks = np.memmap(
+            self._ticks_path, dtype=np.uint64, mode="r+", shape=(rows,)
+        )
+
+    def _flush_files(self) -> None:
+        """메모리 맵 변경 사항을 디스크에 반영"""
+        if self._vectors is not None:
+            self._vectors.flush()
+        if self._ticks is not None:
+            self._ticks.flush()
+
+    def _write_meta(self) -> None:
+        """메타 파일(차원, 행 수, 세대 번호)을 원자적으로 교체"""
+        meta = {"dim": self.dim, "rows": self._rows, "generation": self._generation}
+        tmp_path = f"{self._meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._meta_path)
+
+        stat = os.stat(self._meta_path)
+        self._meta_stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _grow(self, min_rows: int) -> None:
+        """벡터 파일 크기를 늘리고 새로 생긴 행을 빈 행으로 추가"""
+        assert self.dim is not None
+        old_rows = self._rows
+        rows = min(self.max_entries, max(_INITIAL_ROWS, old_rows * 2, min_rows))
+        row_dtype = _row_dtype(self.dim)
+
+        if self._vectors is not None:
+            self._flush_files()
+            self._vectors = None
+            self._ticks = None
+
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(rows * row_dtype.itemsize)
+
+        with open(self._ticks_path, "ab") as f:
+            f.truncate(rows * np.dtype(np.uint64).itemsize)
+
+        self._rows = rows
+        self._map_files(self.dim, rows)
+        self._free_rows.update(range(old_rows, rows))
+        self._write_meta()
+
+    def _evict_rows(self, count: int) -> list[int]:
+        """가장 오래 사용하지 않은 행 count개 선택 (빈 행 제외)"""
+        assert self._ticks is not None
+        ticks = np.asarray(self._ticks)
+        ticks = np.where(ticks == 0, _MAX_TICK, ticks)
+        count = min(count, len(ticks))
+        if count < len(ticks):
+            rows = np.argpartition(ticks, count)[:count]
+        else:
+            rows = np.arange(len(ticks))
+        return rows[np.argsort(ticks[rows])].tolist()
+
+    def get_many(self, keys: list[str]) -> list[list[float] | None]:
+        """키 목록에 해당하는 벡터 조회 (없거나 행의 키가 다르면 None)"""
+        with self._lock, self._file_lock(exclusive=False):
+            self._refresh()
+
+            results: list[list[float] | None] = []
+            now = time.time_ns()
+            for key in keys:
+                row = self._slots.get(key)
+                if row is None or self._vectors is None:
+                    results.append(None)
+                    continue
+
+                if self._vectors["key"][row].tobytes() != bytes.fromhex(key):
+                    # 다른 키로 덮어쓴 행 - 잘못된 벡터 대신 캐시 미스로 처리
+                    results.append(None)
+                    continue
+
+                # 사용 시각은 메모리 맵에만 기록 (디스크 반영은 OS/flush에 맡김)
+                self._ticks[row] = now
+                results.append(self._vectors["vec"][row].tolist())
+            return results
+
+    def put_many(self, keys: list[str], vectors: list[list[float]]) -> None:
+        """벡터 저장 - 새 키 수에 비례하는 만큼만 파일에 기록"""
+        if not keys or self.max_entries <= 0:
+            return
+
+        with self._lock, self._file_lock(exclusive=True):
+            self._refresh()
+
+            if self.dim is None:
+                self.dim = len(vectors[0])
+                self._rows = 0
+                self._generation = 0
+                # 이전 캐시 파일이 남아 있을 수 있으므로 비우고 시작
+                open(self._vectors_path, "wb").close()
+                open(self._ticks_path, "wb").close()
+                open(self._log_path, "wb").close()
+                self._log_offset = 0
+                self._grow(len(keys))
+
+            items: dict[str, list[float]] = {}
+            for key, vector in zip(keys, vectors):
+                if len(vector) != self.dim:
+                    logger.warning(
+                        f"임베딩 차원이 캐시와 다릅니다: {len(vector)} != {self.dim}"
+                    )
+                    continue
+                items[key] = vector
+
+            assert self._vectors is not None
+            now = time.time_ns()
+            new_keys = [key for key in items if key not in self._slots]
+            new_keys = new_keys[-self.max_entries :]
+
+            # 이미 있는 키는 먼저 사용 시각을 갱신해 아래 제거 대상에서 빠지도록 함
+            existing_rows = [self._slots[key] for key in items if key in self._slots]
+            self._ticks[existing_rows] = now
+
+            # 새 키에 행 할당: 빈 행 → 파일 확장 → 오래된 행 제거 순
+            available = self.max_entries - len(self._slots)
+            if len(self._free_rows) < min(len(new_keys), available):
+                self._grow(self._rows + min(len(new_keys), available) - len(self._free_rows))
+            take = min(len(new_keys), available, len(self._free_rows))
+            new_rows = [self._free_rows.pop() for _ in range(take)]
+            new_rows += self._evict_rows(len(new_keys) - take)
+
+            rows_of = dict(zip(new_keys, new_rows))
+            for key, vector in items.items():
+                row = rows_of.get(key, self._slots.get(key))
+                if row is None:
+                    continue
+                # 키를 지운 뒤 벡터를 쓰고 마지막에 키 기록 (중간에 중단되면 빈 행)
+                self._vectors["key"][row] = 0
+                self._vectors["vec"][row] = vector
+                self._ticks[row] = now
+                self._vectors["key"][row] = np.frombuffer(
+                    bytes.fromhex(key), dtype=np.uint8
+                )
+
+            if new_keys:
+                self._append_log(list(zip(new_rows, new_keys)))
+
+    def flush(self) -> None:
+        """벡터 파일과 사용 시각 파일을 디스크에 반영"""
+        with self._lock:
+            self._flush_files()
+
+
+class CachedEmbeddings(Embeddings):
+    """EmbeddingCache를 먼저 조회하고 없는 텍스트만 계산하는 임베딩 래퍼"""
+
+    def __init__(
+        self, embeddings: Embeddings, model_name: str, cache: EmbeddingCache
+    ) -> None:
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """문서 임베딩 - 캐시에 없는 텍스트만 한 번에 계산"""
+        keys = [EmbeddingCache.make_key(self.model_name, text) for text in texts]
+        vectors = self.cache.get_many(keys)
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            computed = self.embeddings.embed_documents([texts[i] for i in missing])
+            self.cache.put_many([keys[i] for i in missing], computed)
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+
+        logger.info(
+            f"임베딩 캐시 - 요청: {len(texts)}개, 적중: {len(texts) - len(missing)}개"
+        )
+        return vectors  # type: ignore[return-value]
+
+    def embed_query(self, text: str) -> list[float]:
+        """질문 임베딩 - 캐시 적중 시 모델 호출 생략"""
+        key = EmbeddingCache.make_key(f"{self.model_name}:query", text)
+        cached = self.cache.get_many([key])[0]
+        if cached is not None:
+            return cached
+
+        vector = self.embeddings.embed_query(text)
+        self.cache.put_many([key], [vector])
+        return vector
@@ -0,0 +1,113 @@
+"""
+카메라 모델별 FAQ 답변 인덱스
+
+자주 묻는 질문과 미리 생성한 답변을 질문 임베딩과 함께 로컬에 저장해 두고,
+사용자 질문이 FAQ 항목과 충분히 유사하면 RAG 파이프라인 없이 바로 답변합니다.
+"""
+
+import json
+import os
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+import numpy as np
+
+from bot_config import logger
+
+# FAQ 인덱스 파일 경로 (확장자 제외, .json/.npy 두 파일로 저장)
+FAQ_INDEX_PATH = os.getenv("FAQ_INDEX_PATH", "faq_index")
+# FAQ 매칭으로 인정할 최소 코사인 유사도
+FAQ_MATCH_THRESHOLD = float(os.getenv("FAQ_MATCH_THRESHOLD", "0.9"))
+
+
+@dataclass
+class FaqEntry:
+    """FAQ 항목 (질문-답변 쌍)"""
+
+    model: str
+    question: str
+    answer: str
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """코사인 유사도 계산을 위해 벡터를 L2 정규화"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class FaqIndex:
+    """모델별 FAQ 질문 임베딩과 답변을 보관하는 인덱스"""
+
+    def __init__(self, entries: list[FaqEntry], embeddings: np.ndarray) -> None:
+        if len(entries) != len(embeddings):
+            raise ValueError("FAQ 항목 수와 임베딩 수가 일치하지 않습니다.")
+
+        self.entries = entries
+        self.embeddings = normalize(embeddings)
+
+        # 모델별 행 번호 (검색 시 해당 모델 항목만 비교)
+        self._rows_by_model: dict[str, np.ndarray] = {}
+        models = np.array([entry.model for entry in entries])
+        for model in set(models.tolist()):
+            self._rows_by_model[model] = np.flatnonzero(models == model)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def match(
+        self,
+        model: str,
+        query_embedding: list[float] | np.ndarray,
+        threshold: float = FAQ_MATCH_THRESHOLD,
+    ) -> Optional[tuple[FaqEntry, float]]:
+        """질문 임베딩과 가장 유사한 FAQ 항목을 찾아 임계값 이상이면 반환"""
+        rows = self._rows_by_model.get(model)
+        if rows is None or len(rows) == 0:
+            return None
+
+        query = normalize(query_embedding)
+        scores = self.embeddings[rows] @ query
+        best = int(np.argmax(scores))
+        score = float(scores[best])
+
+        if score < threshold:
+            return None
+
+        return self.entries[rows[best]], score
+
+    def save(self, path: str = FAQ_INDEX_PATH) -> None:
+        """인덱스를 JSON(항목)과 NPY(임베딩) 파일로 저장"""
+        with open(f"{path}.json", "w", encoding="utf-8") as f:
+            json.dump(
+                [asdict(entry) for entry in self.entries],
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        np.save(f"{path}.npy", self.embeddings.astype(np.float16))
+
+    @classmethod
+    def load(cls, path: str = FAQ_INDEX_PATH) -> "FaqIndex":
+        """저장된 인덱스 파일을 읽어 FaqIndex 생성"""
+        with open(f"{path}.json", encoding="utf-8") as f:
+            entries = [FaqEntry(**item) for item in json.load(f)]
+        embeddings = np.load(f"{path}.npy").astype(np.float32)
+        return cls(entries, embeddings)
+
+
+def load_faq_index(path: str = FAQ_INDEX_PATH) -> Optional[FaqIndex]:
+    """FAQ 인덱스 로드 - 파일이 없거나 손상된 경우 None (RAG로만 답변)"""
+    if not os.path.exists(f"{path}.json") or not os.path.exists(f"{path}.npy"):
+        logger.info(f"FAQ 인덱스 파일이 없습니다: {path}")
+        return None
+
+    try:
+        faq_index = FaqIndex.load(path)
+    except Exception as e:
+        logger.error(f"FAQ 인덱스 로드 실패: {e}")
+        return None
+
+    logger.info(f"FAQ 인덱스 로드 완료: {path}, 항목 수: {len(faq_index)}")
+    return faq_index
@@ -2,7 +2,11 @@
 텔레그램 봇 핸들러 함수들
 """
 
+import asyncio
 import os
+from functools import lru_cache
+from typing import Optional
+
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_pinecone import PineconeVectorStore
 from langchain_groq import ChatGroq
@@ -22,8 +26,17 @@ from bot_config import (
     TYPING_CHOICE,
     SUPPORTED_MODELS,
 )
+from faq_index import FaqIndex
+from embedding_cache import CachedEmbeddings, EmbeddingCache
+from message_sender import MessageSender, PRIORITY_NOTICE
 
 PINECONE_INDEX_NAME = "telegram-camera-bot-index"
+EMBEDDING_MODEL_NAME = "BAAI/bge-m3"
+
+
+def get_sender(context: ContextTypes.DEFAULT_TYPE) -> MessageSender:
+    """발신 메시지 큐 (bot_setup에서 등록)"""
+    return context.bot_data["message_sender"]
 
 
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -39,7 +52,9 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         "/help 명령어로 사용법을 확인하세요."
     )
 
-    await update.message.reply_text(welcome_message, reply_markup=reply_markup_models)
+    get_sender(context).reply(
+        update.message, welcome_message, reply_markup=reply_markup_models
+    )
 
 
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -55,7 +70,7 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         "🔹 /manual - 설명서 검색\n\n"
         "/manual 명령어로 시작해 주세요!"
     )
-    await update.message.reply_html(help_text)
+    get_sender(context).reply(update.message, help_text, html=True)
 
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -75,7 +90,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         "현재는 기본 응답만 제공됩니다."
     )
 
-    await update.message.reply_text(response)
+    get_sender(context).reply(update.message, response)
 
 
 async def start_manual_conversation(
@@ -86,7 +101,8 @@ async def start_manual_conversation(
         logger.warning("업데이트에 메시지나 사용자 정보가 없습니다.")
         return ConversationHandler.END
 
-    await update.message.reply_text(
+    get_sender(context).reply(
+        update.message,
         "다음 카메라 모델 중 하나를 선택해주세요:\n",
         reply_markup=reply_markup_models,
     )
@@ -106,7 +122,8 @@ async def camera_model_choice(
 
     # 지원하는 모델인지 확인
     if model not in SUPPORTED_MODELS:
-        await update.message.reply_text(
+        get_sender(context).reply(
+            update.message,
             f"지원하지 않는 모델입니다. {', '.join(SUPPORTED_MODELS)} 중에서 선택해주세요.",
             reply_markup=reply_markup_models,
         )
@@ -114,7 +131,9 @@ async def camera_model_choice(
 
     context.user_data.update({"choice": model})
 
-    await update.message.reply_text(f"{model}의 어떤 점에 대해 알고 싶으신가요?")
+    get_sender(context).reply(
+        update.message, f"{model}의 어떤 점에 대해 알고 싶으신가요?"
+    )
 
     return TYPING_REPLY
 
@@ -125,7 +144,8 @@ async def handle_fallback(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         logger.warning("업데이트에 메시지나 사용자 정보가 없습니다.")
         return TYPING_CHOICE
 
-    await update.message.reply_text(
+    get_sender(context).reply(
+        update.message,
         f"{', '.join(SUPPORTED_MODELS)} 중 하나를 선택하세요.\n",
         reply_markup=reply_markup_models,
     )
@@ -143,54 +163,120 @@ async def query_manual(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
     model = context.user_data.get("choice", "Unknown")
 
     if not query or not model:
-        await update.message.reply_text(
+        get_sender(context).reply(
+            update.message,
             "질문이 비어있거나 모델이 선택되지 않았습니다. 다시 시도해주세요.",
             reply_markup=reply_markup_models,
         )
         return TYPING_CHOICE
 
-    await update.message.reply_html(
+    # 질문 임베딩은 한 번만 계산해 FAQ 매칭과 매뉴얼 검색에 함께 사용
+    try:
+        query_embedding: Optional[list[float]] = await asyncio.to_thread(
+            get_embeddings_model().embed_query, query
+        )
+    except Exception as e:
+        logger.error(f"질문 임베딩 실패: {e}")
+        query_embedding = None
+
+    faq_index: Optional[FaqIndex] = context.bot_data.get("faq_index")
+    if faq_index and query_embedding is not None:
+        try:
+            faq_match = faq_index.match(model, query_embedding)
+        except Exception as e:
+            logger.error(f"FAQ 매칭 실패: {e}")
+            faq_match = None
+
+        if faq_match:
+            faq_entry, score = faq_match
+            logger.info(
+                f"FAQ 답변 사용 - 모델: {model}, 질문: {faq_entry.question}, "
+                f"유사도: {score:.3f}"
+            )
+            get_sender(context).reply(
+                update.message,
+                format_answer(model, query, faq_entry.answer),
+                reply_markup=reply_markup_commands,
+                html=True,
+            )
+            return TYPING_REPLY
+
+    get_sender(context).reply(
+        update.message,
         "🔍 <b>검색 중...</b>\n\n",
         reply_markup=reply_markup_models,
+        html=True,
+        priority=PRIORITY_NOTICE,
     )
 
-    pinecone_db = None
-
-    embeddings_model = HuggingFaceEmbeddings(model_name="BAAI/bge-m3")
     try:
-        pinecone_api_key = os.environ.get("PINECONE_API_KEY")
-        pc = Pinecone(api_key=pinecone_api_key)
-
-        if not pc.has_index(PINECONE_INDEX_NAME):
-            pc.create_index(
-                name=PINECONE_INDEX_NAME,
-                dimension=1024,
-                metric="cosine",
-                spec=ServerlessSpec(cloud="aws", region="us-east-1"),
-            )
-
-        index = pc.Index(PINECONE_INDEX_NAME)
-        pinecone_db = PineconeVectorStore(index=index, embedding=embeddings_model)
-
-        logger.info(f"로컬 PINECONE DB 로드 완료: {PINECONE_INDEX_NAME}")
+        pinecone_db = await asyncio.to_thread(load_pinecone_db)
     except Exception as e:
         logger.error(f"PINECONE DB 로드 실패: {e}")
-        await update.message.reply_html(
-            "답변 생성에 실패했습니다. 나중에 다시 시도해주세요.",
-            reply_markup=reply_markup_models,
-        )
-
-    if not pinecone_db:
-        await update.message.reply_html(
+        get_sender(context).reply(
+            update.message,
             "Database 연결에 실패했습니다. 나중에 다시 시도해주세요.",
             reply_markup=reply_markup_models,
+            html=True,
         )
         return TYPING_CHOICE
 
-    retriever = pinecone_db.as_retriever(
-        search_kwargs={"k": 1, "filter": {"model": model}}
+    # 검색/답변 생성은 블로킹 작업이므로 스레드에서 실행 (그동안 발신 큐가 동작)
+    answer = await asyncio.to_thread(
+        generate_answer, pinecone_db, model, query, query_embedding
+    )
+
+    get_sender(context).reply(
+        update.message,
+        format_answer(model, query, answer),
+        reply_markup=reply_markup_commands,
+        html=True,
+    )
+
+    return TYPING_REPLY
+
+
+@lru_cache(maxsize=1)
+def get_embeddings_model() -> CachedEmbeddings:
+    """디스크 캐시를 사용하는 임베딩 모델 로드 (프로세스당 한 번만 생성)"""
+    return CachedEmbeddings(
+        HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME),
+        model_name=EMBEDDING_MODEL_NAME,
+        cache=EmbeddingCache(),
     )
 
+
+def load_pinecone_db() -> PineconeVectorStore:
+    """PINECONE 인덱스 연결 (인덱스가 없으면 생성)"""
+    pinecone_api_key = os.environ.get("PINECONE_API_KEY")
+    pc = Pinecone(api_key=pinecone_api_key)
+
+    if not pc.has_index(PINECONE_INDEX_NAME):
+        pc.create_index(
+            name=PINECONE_INDEX_NAME,
+            dimension=1024,
+            metric="cosine",
+            spec=ServerlessSpec(cloud="aws", region="us-east-1"),
+        )
+
+    index = pc.Index(PINECONE_INDEX_NAME)
+    pinecone_db = PineconeVectorStore(index=index, embedding=get_embeddings_model())
+
+    logger.info(f"로컬 PINECONE DB 로드 완료: {PINECONE_INDEX_NAME}")
+    return pinecone_db
+
+
+def generate_answer(
+    pinecone_db: PineconeVectorStore,
+    model: str,
+    query: str,
+    query_embedding: Optional[list[float]] = None,
+) -> str:
+    """매뉴얼 검색 결과를 컨텍스트로 LLM 답변 생성 (RAG)"""
+    # 호출한 쪽에서 계산한 질문 임베딩이 있으면 다시 임베딩하지 않음
+    if query_embedding is None:
+        query_embedding = get_embeddings_model().embed_query(query)
+
     llm = ChatGroq(
         model="gemma2-9b-it",
         temperature=0.2,
@@ -199,7 +285,9 @@ async def query_manual(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
         max_retries=2,
     )
 
-    docs = retriever.invoke(query)
+    docs = pinecone_db.similarity_search_by_vector(
+        query_embedding, k=1, filter={"model": model}
+    )
 
     formatted_docs = []
 
@@ -211,12 +299,17 @@ async def query_manual(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
         if "model" in metadata:
             source_info.append(f"모델: {metadata['model']}")
 
-        if "page_no" in metadata:
-            source_info.append(f"페이지: {metadata['page_no']}")
+        # pages는 실제 PDF 페이지 번호 (page_no는 청크 순번 - 중복 제거 이전 데이터만 사용)
+        pages = metadata.get("pages") or (
+            [str(metadata["page_no"])] if "page_no" in metadata else []
+        )
+
+        if pages:
+            source_info.append(f"페이지: {', '.join(pages)}")
 
         if len(source_info) > 0:
             formatted_docs.append(
-                f"📚 참고 페이지 {metadata['page_no']}\n"
+                f"📚 참고 페이지 {pages[0] if pages else '-'}\n"
                 f"• {' | '.join(source_info) if source_info else '출처 정보 없음'}\n"
                 # f"• 내용: {doc.page_content[:100]}{'...' if len(doc.page_content) > 100 else ''}"
             )
@@ -246,9 +339,12 @@ async def query_manual(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
         | StrOutputParser()
     )
 
-    answer = chain.invoke(query)
+    return chain.invoke(query)
 
-    help_text = (
+
+def format_answer(model: str, query: str, answer: str) -> str:
+    """답변 메시지 포맷팅"""
+    return (
         f"🔍 {model}: {query}\n\n"
         "🔹 <b>검색 결과</b>:\n"
         f"{answer}\n\n"
@@ -256,13 +352,6 @@ async def query_manual(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
         "🔹 'DONE'을 선택해서 대화를 종료할 수 있습니다.\n"
     )
 
-    await update.message.reply_html(
-        help_text,
-        reply_markup=reply_markup_commands,
-    )
-
-    return TYPING_REPLY
-
 
 async def done(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """대화 종료"""
@@ -274,7 +363,8 @@ async def done(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     if "choice" in user_data:
         del user_data["choice"]
 
-    await update.message.reply_text(
+    get_sender(context).reply(
+        update.message,
         "🤖 대화가 종료되었습니다!",
         reply_markup=ReplyKeyboardRemove(),
     )
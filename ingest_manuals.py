@@ -0,0 +1,261 @@
+"""
+매뉴얼 PDF 일괄 적재 스크립트
+
+디렉터리 안의 PDF를 모델 매핑 파일에 따라 한 번에 PINECONE DB에 저장합니다.
+PDF 분할/중복 제거는 여러 프로세스에서 동시에 처리하고, 저장은 배치 단위로
+체크포인트에 기록하므로 중간에 실패해도 다시 실행하면 완료된 작업은 건너뜁니다.
+
+매핑 파일 형식 (파일 이름 glob 패턴 → 카메라 모델, 위에서부터 먼저 일치하는 항목 사용):
+    {
+        "X-T30*.pdf": "X-T30",
+        "*z5ii*.pdf": "Z5II"
+    }
+
+사용법:
+    uv run python ingest_manuals.py manuals/ --mapping manual_models.json
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Optional
+
+from bot_config import logger, SUPPORTED_MODELS
+from chunk_dedup import DEDUP_THRESHOLD
+from handlers import load_pinecone_db
+from ingestion import delete_chunks, split_manual, store_chunks
+
+CHECKPOINT_FILE_NAME = ".ingest_checkpoint.json"
+
+
+def load_model_mapping(mapping_path: str) -> list[tuple[str, str]]:
+    """매핑 파일을 읽어 (패턴, 모델) 목록 반환"""
+    with open(mapping_path, encoding="utf-8") as f:
+        mapping: dict[str, str] = json.load(f)
+
+    for pattern, model in mapping.items():
+        if model not in SUPPORTED_MODELS:
+            raise ValueError(f"지원하지 않는 모델입니다: {pattern} → {model}")
+
+    return list(mapping.items())
+
+
+def resolve_model(file_name: str, mapping: list[tuple[str, str]]) -> Optional[str]:
+    """파일 이름과 일치하는 첫 번째 패턴의 모델 반환"""
+    for pattern, model in mapping:
+        if fnmatch.fnmatch(file_name.lower(), pattern.lower()):
+            return model
+    return None
+
+
+def file_sha256(path: Path) -> str:
+    """파일 내용 해시 (파일이 바뀌면 체크포인트를 무시하고 다시 적재)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Checkpoint:
+    """파일별 적재 진행 상황 (저장 완료된 청크 수, 삭제할 이전 청크) 저장"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.files: dict[str, dict] = {}
+
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                self.files = json.load(f).get("files", {})
+
+    def get(self, key: str, sha256: str, model: str) -> dict:
+        """파일 진행 상황 조회 - 내용, 모델, 중복 제거 기준이 바뀌었으면 처음부터"""
+        entry = self.files.get(key)
+        if (
+            entry
+            and entry["sha256"] == sha256
+            and entry["model"] == model
+            and entry.get("dedup_threshold") == DEDUP_THRESHOLD
+            and "chunks_done" in entry
+        ):
+            return entry
+
+        new_entry = {
+            "sha256": sha256,
+            "model": model,
+            "dedup_threshold": DEDUP_THRESHOLD,
+            "chunks_total": 0,
+            "chunks_done": 0,
+            "done": False,
+        }
+
+        # 이전 버전에서 저장한 청크는 다시 적재하기 전에 삭제 (청크 수가 줄거나 모델이 바뀌면 남음)
+        stale = list(entry.get("stale", [])) if entry else []
+        if entry:
+            chunk_count = max(entry.get("chunks_total", 0), entry.get("chunks_done", 0))
+            if chunk_count:
+                stale.append(
+                    {"model": entry["model"], "source": key, "chunks": chunk_count}
+                )
+        if stale:
+            new_entry["stale"] = stale
+
+        self.files[key] = new_entry
+        return new_entry
+
+    def save(self) -> None:
+        """체크포인트 파일을 원자적으로 교체"""
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"files": self.files}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def ingest_directory(
+    directory: str,
+    mapping_path: str,
+    workers: int,
+    batch_size: int,
+    checkpoint_path: Optional[str] = None,
+) -> bool:
+    """디렉터리의 PDF를 일괄 적재 - 모든 파일이 성공하면 True"""
+    root = Path(directory)
+    mapping = load_model_mapping(mapping_path)
+    checkpoint = Checkpoint(
+        Path(checkpoint_path) if checkpoint_path else root / CHECKPOINT_FILE_NAME
+    )
+
+    # 적재할 파일 목록 (완료된 파일은 건너뜀)
+    pending: list[tuple[Path, str, str]] = []
+    for pdf_path in sorted(root.rglob("*.pdf")):
+        key = pdf_path.relative_to(root).as_posix()
+        model = resolve_model(pdf_path.name, mapping)
+        if not model:
+            logger.warning(f"매핑되는 모델이 없어 건너뜁니다: {key}")
+            continue
+
+        entry = checkpoint.get(key, file_sha256(pdf_path), model)
+        if entry["done"]:
+            logger.info(f"이미 적재된 파일: {key}")
+            continue
+
+        pending.append((pdf_path, key, model))
+
+    checkpoint.save()
+
+    if not pending:
+        logger.info("적재할 파일이 없습니다.")
+        return True
+
+    logger.info(f"📚 적재 시작 - 파일 {len(pending)}개, 워커 {workers}개")
+
+    started_at = time.perf_counter()
+    total_pages = 0
+    total_chunks = 0
+    failed: list[str] = []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # PDF 분할/중복 제거는 워커 프로세스에서 병렬 처리
+        # source는 상대 경로 (하위 폴더에 같은 파일 이름이 있어도 청크 ID가 겹치지 않도록)
+        futures = {
+            executor.submit(split_manual, str(pdf_path), model, key): key
+            for pdf_path, key, model in pending
+        }
+
+        # 임베딩/저장은 메인 프로세스에서 (임베딩 모델과 캐시를 한 번만 로드)
+        pinecone_db = load_pinecone_db()
+
+        for future in as_completed(futures):
+            key = futures[future]
+            entry = checkpoint.files[key]
+            file_started_at = time.perf_counter()
+
+            try:
+                split_result = future.result()
+                texts = split_result.texts
+
+                # 이전 버전(내용/모델/중복 제거 기준 변경 전)의 청크 삭제
+                for stale in entry.get("stale", []):
+                    delete_chunks(
+                        pinecone_db, stale["model"], stale["source"], stale["chunks"]
+                    )
+                    logger.info(
+                        f"이전 청크 삭제: {key} ({stale['model']}), {stale['chunks']}개"
+                    )
+                entry.pop("stale", None)
+                # 저장 도중 실패해도 이미 저장된 청크를 삭제할 수 있도록 전체 청크 수를 먼저 기록
+                entry["chunks_total"] = len(texts)
+                checkpoint.save()
+
+                # 청크 수 기준으로 이어서 저장 (재실행 시 배치 크기가 달라도 안전)
+                for start in range(entry["chunks_done"], len(texts), batch_size):
+                    batch = texts[start : start + batch_size]
+                    store_chunks(pinecone_db, batch)
+                    entry["chunks_done"] = start + len(batch)
+                    checkpoint.save()
+
+                entry["done"] = True
+                checkpoint.save()
+            except Exception as e:
+                logger.error(f"적재 실패: {key}, {e}")
+                failed.append(key)
+                continue
+
+            total_pages += split_result.page_count
+            total_chunks += len(texts)
+            elapsed = time.perf_counter() - file_started_at
+            logger.info(
+                f"적재 완료: {key} ({entry['model']}), 페이지 {split_result.page_count}개, "
+                f"청크 {len(texts)}개 (중복 {split_result.dedup_stats.removed_chunks}개 제거), "
+                f"저장 {elapsed:.1f}초"
+            )
+
+    elapsed = time.perf_counter() - started_at
+    logger.info(
+        f"📊 적재 결과 - 파일 {len(pending) - len(failed)}/{len(pending)}개, "
+        f"페이지 {total_pages}개, 청크 {total_chunks}개, {elapsed:.1f}초 "
+        f"({total_pages / elapsed:.2f} pages/s, {total_chunks / elapsed:.2f} chunks/s)"
+    )
+
+    if failed:
+        logger.error(f"실패한 파일 (다시 실행하면 이어서 적재): {', '.join(failed)}")
+
+    return not failed
+
+
+def main() -> None:
+    """메인 함수 - 디렉터리 일괄 적재"""
+    parser = argparse.ArgumentParser(description="매뉴얼 PDF 일괄 적재")
+    parser.add_argument("directory", help="PDF 파일이 있는 디렉터리")
+    parser.add_argument(
+        "--mapping", required=True, help="파일 이름 패턴 → 모델 매핑 JSON 파일"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="PDF 분할 프로세스 수 (기본값: CPU 코어 수)",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=64, help="저장 배치당 청크 수"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help=f"체크포인트 파일 경로 (기본값: <directory>/{CHECKPOINT_FILE_NAME})",
+    )
+    args = parser.parse_args()
+
+    ok = ingest_directory(
+        args.directory, args.mapping, args.workers, args.batch_size, args.checkpoint
+    )
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+매뉴얼 PDF 적재 공통 함수
+
+PDF 로드 → 청크 분할 → 중복 제거 → PINECONE 저장 단계를
+웹 업로드(`POST /pdf/upload`)와 일괄 적재 스크립트에서 함께 사용합니다.
+"""
+
+import os
+import uuid
+from dataclasses import dataclass
+
+from langchain_community.document_loaders import PyPDFLoader
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from chunk_dedup import DedupStats, deduplicate_documents
+
+# 청크 ID 생성용 네임스페이스 (같은 파일/모델/순번이면 항상 같은 ID)
+_DOC_ID_NAMESPACE = uuid.UUID("6f1c1b1e-3a52-4b8e-9a55-2f0d4c7a9e10")
+
+
+@dataclass
+class SplitResult:
+    """PDF 분할 결과"""
+
+    texts: list[Document]
+    page_count: int
+    dedup_stats: DedupStats
+
+
+def split_manual(pdf_path: str, model: str, source: str) -> SplitResult:
+    """PDF를 읽어 청크로 분할하고 중복 청크를 제거"""
+    loader = PyPDFLoader(pdf_path)
+    documents = loader.load()
+
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=1000,
+        chunk_overlap=200,
+        length_function=len,  # 토큰 수를 기준으로 분할
+        separators=["\n\n", "\n", " ", ""],  # 구분자 - 재귀적으로 순차적으로 적용
+    )
+    texts = text_splitter.split_documents(documents)
+
+    # 반복되는 경고문/각주/메뉴 표 등 거의 동일한 청크 제거
+    texts, dedup_stats = deduplicate_documents(texts)
+
+    for i, text in enumerate(texts):
+        text.metadata["model"] = model
+        text.metadata["source"] = source
+        # 경로를 뺀 파일 이름 (업로드 API의 중복 확인에 사용)
+        text.metadata["file_name"] = os.path.basename(source)
+        # 청크 순번 (문서 ID 생성에 사용, 실제 PDF 페이지는 pages 메타데이터)
+        text.metadata["page_no"] = i + 1
+
+    return SplitResult(
+        texts=texts, page_count=len(documents), dedup_stats=dedup_stats
+    )
+
+
+def make_doc_id(model: str, source: str, page_no: int) -> str:
+    """모델/파일/청크 순번으로 결정적인 문서 ID 생성 (재적재 시 덮어쓰기)"""
+    return str(uuid.uuid5(_DOC_ID_NAMESPACE, f"{model}/{source}/{page_no}"))
+
+
+def make_doc_ids(texts: list[Document]) -> list[str]:
+    """청크 목록의 문서 ID 생성"""
+    return [
+        make_doc_id(
+            text.metadata["model"], text.metadata["source"], text.metadata["page_no"]
+        )
+        for text in texts
+    ]
+
+
+def store_chunks(vector_store: VectorStore, texts: list[Document]) -> list[str]:
+    """청크를 벡터 저장소에 저장하고 저장된 ID 반환"""
+    return vector_store.add_documents(
+        documents=texts,  # 문서 리스트
+        ids=make_doc_ids(texts),  # 문서 id 리스트
+    )
+
+
+def delete_chunks(
+    vector_store: VectorStore, model: str, source: str, chunk_count: int
+) -> None:
+    """이전에 저장한 파일의 청크 삭제 (ID는 모델/파일/순번으로 다시 계산)"""
+    ids = [make_doc_id(model, source, page_no) for page_no in range(1, chunk_count + 1)]
+    # PINECONE은 한 번에 최대 1000개 ID까지 삭제 가능
+    for start in range(0, len(ids), 1000):
+        vector_store.delete(ids=ids[start : start + 1000])
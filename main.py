@@ -1,28 +1,24 @@
 import os
 import asyncio
 import tempfile
+from datetime import timedelta
 from contextlib import asynccontextmanager
 from typing import Optional
-import uuid
 
 from fastapi import FastAPI, UploadFile, File, HTTPException, Query
 from fastapi.responses import JSONResponse
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_pinecone import PineconeVectorStore
-from langchain_text_splitters import (
-    RecursiveCharacterTextSplitter,
-)
 import uvicorn
 from telegram import Update
+from telegram.error import RetryAfter
 from telegram.ext import Application
 
 # 봇 설정 모듈 import
 from bot_config import BOT_TOKEN, logger
-from bot_setup import create_bot_application
+from bot_setup import create_bot_application, stop_message_sender
 
-from langchain_community.document_loaders import PyPDFLoader
-from pinecone import Pinecone, ServerlessSpec
-from handlers import PINECONE_INDEX_NAME
+from pinecone import Pinecone
+from handlers import load_pinecone_db
+from ingestion import split_manual, store_chunks
 
 # 전역 변수
 telegram_app: Optional[Application] = None
@@ -68,6 +64,13 @@ async def start_telegram_bot() -> None:
                 # 잠시 대기
                 await asyncio.sleep(1)
 
+            except RetryAfter as e:
+                logger.warning(f"폴링 전송 제한: {e.retry_after}초 후 재시도")
+                await asyncio.sleep(
+                    e.retry_after.total_seconds()
+                    if isinstance(e.retry_after, timedelta)
+                    else e.retry_after
+                )
             except Exception as poll_error:
                 logger.error(f"폴링 중 오류: {poll_error}")
                 await asyncio.sleep(5)  # 오류 시 5초 대기 후 재시도
@@ -99,16 +102,7 @@ async def lifespan(app: FastAPI):
     # 종료 시 정리
     logger.info("서버 종료 중...")
 
-    # 봇 먼저 정리
-    if telegram_app:
-        try:
-            await telegram_app.stop()
-            await telegram_app.shutdown()
-            logger.info("텔레그램 봇 정리 완료")
-        except Exception as e:
-            logger.error(f"봇 정리 중 오류: {e}")
-
-    # 태스크 취소
+    # 폴링 태스크 먼저 취소 (새 업데이트가 처리되어 발신 큐에 메시지가 추가되지 않도록)
     if bot_task and not bot_task.done():
         bot_task.cancel()
         try:
@@ -118,6 +112,16 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"태스크 취소 중 오류: {e}")
 
+    # 남은 발신 메시지를 보낸 뒤 봇 정리
+    if telegram_app:
+        try:
+            await stop_message_sender(telegram_app)
+            await telegram_app.stop()
+            await telegram_app.shutdown()
+            logger.info("텔레그램 봇 정리 완료")
+        except Exception as e:
+            logger.error(f"봇 정리 중 오류: {e}")
+
     logger.info("서버 종료 완료")
 
 
@@ -149,11 +153,14 @@ async def bot_status():
     bot_running = telegram_app is not None and telegram_app.running
     task_running = bot_task is not None and not bot_task.done()
 
+    sender = telegram_app.bot_data.get("message_sender") if telegram_app else None
+
     return {
         "bot_initialized": telegram_app is not None,
         "bot_running": bot_running,
         "task_running": task_running,
         "mode": "polling",
+        "send_queue": sender.stats() if sender else None,
     }
 
 
@@ -181,35 +188,29 @@ async def upload_pdf(
         raise HTTPException(status_code=400, detail="PDF 파일만 업로드 가능합니다.")
 
     try:
-        pinecone_db = None
-
-        embeddings_model = HuggingFaceEmbeddings(model_name="BAAI/bge-m3")
         try:
-            pinecone_api_key = os.environ.get("PINECONE_API_KEY")
-            pc = Pinecone(api_key=pinecone_api_key)
-
-            if not pc.has_index(PINECONE_INDEX_NAME):
-                pc.create_index(
-                    name=PINECONE_INDEX_NAME,
-                    dimension=1024,
-                    metric="cosine",
-                    spec=ServerlessSpec(cloud="aws", region="us-east-1"),
-                )
-
-            index = pc.Index(PINECONE_INDEX_NAME)
-            pinecone_db = PineconeVectorStore(index=index, embedding=embeddings_model)
-
-            logger.info(f"로컬 PINECONE DB 로드 완료: {PINECONE_INDEX_NAME}")
+            pinecone_db = load_pinecone_db()
         except Exception as e:
             logger.error(f"PINECONE DB 로드 실패: {e}")
             raise HTTPException(
                 status_code=500, detail="PINECONE DB 로드 중 오류가 발생했습니다."
             )
 
+        # 일괄 적재 스크립트는 source에 상대 경로를 저장하므로 file_name으로도 확인
         saved_docs = pinecone_db.similarity_search(
             model,
             k=1,
-            filter={"$and": [{"model": model}, {"source": file.filename}]},
+            filter={
+                "$and": [
+                    {"model": model},
+                    {
+                        "$or": [
+                            {"source": file.filename},
+                            {"file_name": file.filename},
+                        ]
+                    },
+                ]
+            },
         )
 
         if saved_docs:
@@ -232,27 +233,14 @@ async def upload_pdf(
             tmp_file.write(content)
             tmp_file_path = tmp_file.name
 
-        loader = PyPDFLoader(tmp_file_path)
-        documents = loader.load()
-
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len,  # 토큰 수를 기준으로 분할
-            separators=["\n\n", "\n", " ", ""],  # 구분자 - 재귀적으로 순차적으로 적용
+        split_result = split_manual(tmp_file_path, model, file.filename)
+        dedup_stats = split_result.dedup_stats
+        logger.info(
+            f"청크 중복 제거: {file.filename}, 전체 {dedup_stats.total_chunks}개 → "
+            f"{dedup_stats.unique_chunks}개 ({dedup_stats.reduction_ratio:.1%} 감소)"
         )
-        texts = text_splitter.split_documents(documents)
-        doc_ids = [str(uuid.uuid4()) for _ in range(len(texts))]
 
-        for i, text in enumerate(texts):
-            text.metadata["model"] = model
-            text.metadata["source"] = file.filename
-            text.metadata["page_no"] = i + 1
-
-        added_doc_ids = pinecone_db.add_documents(
-            documents=texts,  # 문서 리스트
-            doc_ids=doc_ids,  # 문서 id 리스트
-        )
+        added_doc_ids = store_chunks(pinecone_db, split_result.texts)
 
         logger.info(
             f"PDF 업로드 완료: {file.filename}, 이름: {model}, Pinecone DB 저장 개수: {len(added_doc_ids)}"
@@ -264,6 +252,11 @@ async def upload_pdf(
                 "message": "PDF 업로드 및 처리 완료",
                 "filename": file.filename,
                 "name": model,
+                "chunks": {
+                    "total": dedup_stats.total_chunks,
+                    "unique": dedup_stats.unique_chunks,
+                    "removed": dedup_stats.removed_chunks,
+                },
             },
         )
 
@@ -0,0 +1,273 @@
+"""
+텔레그램 발신 메시지 큐
+
+핸들러가 보내는 메시지를 큐에 모아 전체/채팅별 전송 속도 제한을 지키며 보냅니다.
+429(RetryAfter) 응답을 받으면 해당 채팅만 지정된 시간 동안 보류하고 다시 보내며,
+최종 답변을 진행 안내 메시지보다 먼저 보냅니다.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Optional
+
+from telegram import Message
+from telegram.error import RetryAfter
+
+from bot_config import logger
+
+# 초당 최대 전송 수 (봇 전체 / 채팅별)
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "30"))
+TELEGRAM_CHAT_RATE = float(os.getenv("TELEGRAM_CHAT_RATE", "1"))
+# RetryAfter 발생 시 최대 재시도 횟수
+TELEGRAM_MAX_RETRIES = int(os.getenv("TELEGRAM_MAX_RETRIES", "3"))
+
+# 전송 우선순위 (작을수록 먼저 전송)
+PRIORITY_ANSWER = 0
+PRIORITY_NOTICE = 1
+
+
+@dataclass(order=True)
+class _OutboundMessage:
+    """큐에 대기 중인 발신 메시지"""
+
+    priority: int
+    seq: int
+    chat_id: int = field(compare=False)
+    send: Callable[[], Awaitable[Any]] = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    attempts: int = field(default=0, compare=False)
+
+
+class MessageSender:
+    """전송 속도 제한과 우선순위를 적용하는 발신 메시지 스케줄러"""
+
+    def __init__(
+        self,
+        global_rate: float = TELEGRAM_GLOBAL_RATE,
+        chat_rate: float = TELEGRAM_CHAT_RATE,
+        max_retries: int = TELEGRAM_MAX_RETRIES,
+    ) -> None:
+        self._global_interval = 1.0 / global_rate
+        self._chat_interval = 1.0 / chat_rate
+        self._max_retries = max_retries
+
+        self._queue: list[_OutboundMessage] = []
+        self._seq = itertools.count()
+        # 채팅별 다음 전송 가능 시각 (속도 제한, RetryAfter 보류)
+        self._chat_ready_at: dict[int, float] = {}
+        # 전송 중인 채팅 (채팅 내 메시지 순서 유지)
+        self._busy_chats: set[int] = set()
+        self._next_send_at = 0.0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._deliveries: set[asyncio.Task] = set()
+
+        # 통계
+        self._sent = 0
+        self._failed = 0
+        self._retried = 0
+        self._dropped = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def enqueue(
+        self,
+        chat_id: int,
+        send: Callable[[], Awaitable[Any]],
+        priority: int = PRIORITY_ANSWER,
+    ) -> None:
+        """메시지 전송 요청을 큐에 추가 (전송 완료를 기다리지 않음)"""
+        # 최종 답변이 들어오면 같은 채팅의 아직 보내지 않은 진행 안내는 의미가 없으므로 제거
+        if priority < PRIORITY_NOTICE:
+            remaining = [
+                item
+                for item in self._queue
+                if not (item.chat_id == chat_id and item.priority >= PRIORITY_NOTICE)
+            ]
+            if len(remaining) != len(self._queue):
+                self._dropped += len(self._queue) - len(remaining)
+                self._queue = remaining
+                heapq.heapify(self._queue)
+
+        loop = asyncio.get_running_loop()
+        heapq.heappush(
+            self._queue,
+            _OutboundMessage(
+                priority=priority,
+                seq=next(self._seq),
+                chat_id=chat_id,
+                send=send,
+                enqueued_at=loop.time(),
+            ),
+        )
+        self._wakeup.set()
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def reply(
+        self,
+        message: Message,
+        text: str,
+        *,
+        html: bool = False,
+        priority: int = PRIORITY_ANSWER,
+        **kwargs: Any,
+    ) -> None:
+        """메시지에 대한 답장을 큐에 추가"""
+        reply = message.reply_html if html else message.reply_text
+        self.enqueue(message.chat_id, lambda: reply(text, **kwargs), priority)
+
+    def stats(self) -> dict[str, Any]:
+        """큐 길이와 전송 지연 통계"""
+        completed = self._sent + self._failed
+        return {
+            "queue_depth": len(self._queue),
+            "in_flight": len(self._busy_chats),
+            "backoff_chats": sum(
+                1
+                for ready_at in self._chat_ready_at.values()
+                if ready_at > self._now() + self._chat_interval
+            ),
+            "sent": self._sent,
+            "failed": self._failed,
+            "retried": self._retried,
+            "dropped_notices": self._dropped,
+            "avg_latency_ms": (
+                round(self._latency_total / completed * 1000, 1) if completed else 0.0
+            ),
+            "max_latency_ms": round(self._latency_max * 1000, 1),
+        }
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """남은 메시지를 최대 timeout초 동안 보낸 뒤 스케줄러 종료"""
+        deadline = self._now() + timeout
+        while (self._queue or self._busy_chats) and self._now() < deadline:
+            await asyncio.sleep(0.1)
+
+        tasks = [*self._deliveries]
+        if self._task:
+            tasks.append(self._task)
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        if self._queue:
+            logger.warning(f"전송하지 못한 메시지 {len(self._queue)}개를 버립니다.")
+            self._queue.clear()
+
+    @staticmethod
+    def _now() -> float:
+        return asyncio.get_running_loop().time()
+
+    def _next_ready(self) -> tuple[Optional[_OutboundMessage], Optional[float]]:
+        """지금 보낼 수 있는 가장 우선순위가 높은 메시지와, 없으면 대기 시간 반환"""
+        now = self._now()
+        skipped: list[_OutboundMessage] = []
+        ready: Optional[_OutboundMessage] = None
+        wait: Optional[float] = None
+
+        while self._queue:
+            item = heapq.heappop(self._queue)
+            if item.chat_id in self._busy_chats:
+                skipped.append(item)
+                continue
+
+            ready_at = self._chat_ready_at.get(item.chat_id, 0.0)
+            if ready_at > now:
+                skipped.append(item)
+                wait = ready_at - now if wait is None else min(wait, ready_at - now)
+                continue
+
+            ready = item
+            break
+
+        for item in skipped:
+            heapq.heappush(self._queue, item)
+
+        return ready, wait
+
+    async def _run(self) -> None:
+        """큐에서 보낼 수 있는 메시지를 꺼내 전체 전송 간격에 맞춰 전송"""
+        while True:
+            self._wakeup.clear()
+            item, wait = self._next_ready()
+
+            if item is None:
+                if not self._queue:
+                    self._prune_chats()
+                # 새 메시지, 전송 완료, 채팅 보류 해제 중 먼저 오는 시점까지 대기
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except TimeoutError:
+                    pass
+                continue
+
+            delay = self._next_send_at - self._now()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_send_at = self._now() + self._global_interval
+
+            self._busy_chats.add(item.chat_id)
+            task = asyncio.create_task(self._deliver(item))
+            self._deliveries.add(task)
+            task.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(self, item: _OutboundMessage) -> None:
+        """메시지 전송 - RetryAfter 시 해당 채팅만 보류 후 다시 큐에 추가"""
+        chat_ready_at = self._now() + self._chat_interval
+
+        try:
+            await item.send()
+        except RetryAfter as e:
+            retry_after = e.retry_after
+            if isinstance(retry_after, timedelta):
+                retry_after = retry_after.total_seconds()
+            chat_ready_at = self._now() + retry_after
+
+            item.attempts += 1
+            if item.attempts <= self._max_retries:
+                logger.warning(
+                    f"전송 제한 - 채팅: {item.chat_id}, {retry_after}초 후 재시도 "
+                    f"({item.attempts}/{self._max_retries})"
+                )
+                self._retried += 1
+                heapq.heappush(self._queue, item)
+            else:
+                logger.error(f"전송 제한으로 메시지 전송 실패 - 채팅: {item.chat_id}")
+                self._record(item, failed=True)
+        except Exception as e:
+            logger.error(f"메시지 전송 실패 - 채팅: {item.chat_id}, {e}")
+            self._record(item, failed=True)
+        else:
+            self._record(item, failed=False)
+        finally:
+            self._busy_chats.discard(item.chat_id)
+            self._chat_ready_at[item.chat_id] = max(
+                self._chat_ready_at.get(item.chat_id, 0.0), chat_ready_at
+            )
+            self._wakeup.set()
+
+    def _prune_chats(self) -> None:
+        """전송 가능 시각이 지난 채팅 기록 정리"""
+        now = self._now()
+        self._chat_ready_at = {
+            chat_id: ready_at
+            for chat_id, ready_at in self._chat_ready_at.items()
+            if ready_at > now
+        }
+
+    def _record(self, item: _OutboundMessage, failed: bool) -> None:
+        """전송 결과 통계 기록 (큐 대기 시간 포함)"""
+        latency = self._now() - item.enqueued_at
+        self._latency_total += latency
+        self._latency_max = max(self._latency_max, latency)
+        if failed:
+            self._failed += 1
+        else:
+            self._sent += 1